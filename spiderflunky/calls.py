@@ -1,12 +1,31 @@
-from spiderflunky.js_ast import CALL_EXPR, FUNC_EXPR, IDENT
+from spiderflunky.indexer import ARROW_GROUP, FUNC_GROUP, GROUPS
+from spiderflunky.js_ast import CALL_EXPR, FUNC_EXPR, IDENT, is_node, walk_down
 from spiderflunky.parser import parse
 
+from funcy import ifilter, iflatten
 from networkx import DiGraph
 
 
 def call_sites(ast):
     """Yield the AST nodes representing function calls."""
-    return (node for node in ast.walk_down() if isinstance(node, CallExpression))
+    return (node for node in walk_down(ast) if node['type'] == CALL_EXPR)
+
+
+def call_edges(node, caller=None):
+    """Yield (caller, call site) for each function call at or under
+    ``node``, in depth-first pre-order.
+
+    The caller is the nearest function node enclosing the call site, or
+    None if there isn't one.
+
+    """
+    if node['type'] == CALL_EXPR:
+        yield caller, node
+    if GROUPS.get(node['type']) in (FUNC_GROUP, ARROW_GROUP):
+        caller = node
+    for child in ifilter(is_node, iflatten(node.itervalues())):
+        for edge in call_edges(child, caller):
+            yield edge
 
 
 def call_graph(ast):
@@ -48,6 +67,17 @@ def lookup(call_site):
         return None
 
 
+def callee_name(call_site):
+    """Return the name this call_site calls through, or None if the callee
+    isn't a plain identifier or named function expression."""
+    callee = call_site['callee']
+    if callee['type'] == IDENT:
+        return callee['name']
+    elif callee['type'] == FUNC_EXPR and callee['id'] is not None:
+        return callee['id']['name']
+    return None
+
+
 def get_name(node):
     """Return the identifier for this node."""
 
@@ -1,5 +1,5 @@
 from collections import namedtuple
-from spiderflunky.js_ast import ASSIGN_EXPR, VAR_DECLARATOR
+from spiderflunky.js_ast import ASSIGN_EXPR, VAR_DECLARATOR, walk_down
 
 
 # scope is an AST node.
@@ -13,7 +13,7 @@ def assignments(ast):
     out assignments with literal strings and ints and such on the RHS.
 
     """
-    return (node for node in ast.walk_down() if
+    return (node for node in walk_down(ast) if
             (node['type'] == ASSIGN_EXPR and node['operator'] == '=') or
             (node['type'] == VAR_DECLARATOR and node['init'] is not None))
 
@@ -0,0 +1,277 @@
+"""Keep the AST of a file being edited up to date without reparsing all of it.
+
+The file is split at top-level statement boundaries. On each edit, only the
+run of statements whose text changed is handed to ``Reflect.parse``, along
+with one unchanged neighbor on each side to make sure the edit didn't change
+where the surrounding statements begin or end (think automatic semicolon
+insertion). Untouched statements after the edit that have moved are copied
+with their ``loc`` data shifted, and everything is stitched back into a
+``Program``.
+
+"""
+import re
+import sys
+from bisect import bisect_right
+
+from spiderflunky.indexer import NONE_GROUP, process, transform
+from spiderflunky.js_ast import EXPR_STMT, LITERAL
+from spiderflunky.parser import JsReflectException, parse, prepare_code
+
+
+# What Reflect.parse counts as ending a line
+NEWLINES = re.compile(u'\r\n|[\n\r\u2028\u2029]')
+
+# Characters outside the BMP. Reflect.parse counts columns in UTF-16 code
+# units, so these are two columns wide to it but one character to a wide
+# Python build, and offsets worked out from their lines come out wrong. Narrow
+# builds already store them as two code units, so they need no special care.
+ASTRAL = (re.compile(u'[\U00010000-\U0010ffff]') if sys.maxunicode > 0xffff
+          else None)
+
+
+def _line_starts(code):
+    """Return a list of the offsets at which each line of ``code`` starts."""
+    return [0] + [m.end() for m in NEWLINES.finditer(code)]
+
+
+def _offset(line_starts, position):
+    """Convert a Reflect.parse ``{line, column}`` position to an offset."""
+    return line_starts[position['line'] - 1] + position['column']
+
+
+def _position(line_starts, offset):
+    """Convert an offset to a Reflect.parse (line, column) pair."""
+    line = bisect_right(line_starts, offset) - 1
+    return line + 1, offset - line_starts[line]
+
+
+def shifted(node, line, column, to_line, to_column):
+    """Return a copy of ``node`` with its positions moved so what was at
+    ``line``, ``column`` ends up at ``to_line``, ``to_column``.
+
+    Only positions on ``line`` change columns; the rest just change lines.
+    This is right as long as nothing in ``node`` starts before ``line``,
+    ``column``. ``node`` itself is left alone; if nothing moves, it is
+    returned as is.
+
+    """
+    dline, dcolumn = to_line - line, to_column - column
+    if not dline and not dcolumn:
+        return node
+    return _shifted(node, line, dline, dcolumn)
+
+
+def _shifted(value, line, dline, dcolumn):
+    """Copy a dict or list from an AST, moving its positions as for
+    :func:`shifted`."""
+    # This runs over every node after an edit that adds or removes lines, so
+    # it steers clear of calls it doesn't need, like recursing into strings.
+    if isinstance(value, list):
+        return [_shifted(item, line, dline, dcolumn) if
+                isinstance(item, (dict, list)) else item for item in value]
+    ret = {}
+    for key, item in value.iteritems():
+        if key == 'loc':
+            if item:
+                item = dict(item,
+                            start=_moved(item['start'], line, dline, dcolumn),
+                            end=_moved(item['end'], line, dline, dcolumn))
+        elif isinstance(item, (dict, list)):
+            item = _shifted(item, line, dline, dcolumn)
+        ret[key] = item
+    return ret
+
+
+def _moved(position, line, dline, dcolumn):
+    """Return a moved copy of a single position, as for :func:`shifted`."""
+    return {'line': position['line'] + dline,
+            'column': position['column'] + (dcolumn if
+                                            position['line'] == line else 0)}
+
+
+def _prologue_length(body):
+    """Return how many statements at the start of ``body`` are directives,
+    like ``"use strict"``."""
+    for i, node in enumerate(body):
+        if not (node['type'] == EXPR_STMT and
+                node['expression']['type'] == LITERAL and
+                isinstance(node['expression']['value'], basestring)):
+            return i
+    return len(body)
+
+
+class IncrementalParser(object):
+    """An AST of some JS that can be cheaply updated as the JS is edited.
+
+    Usage::
+
+        parser = IncrementalParser(code)
+        ast = parser.update(edited_code)
+
+    Statements an edit doesn't touch or move are shared with earlier ASTs
+    returned from here rather than copied. Nothing returned is ever changed
+    afterward.
+
+    """
+    def __init__(self, code, shell='js'):
+        self.shell = shell
+        self._reparse(prepare_code(code))
+
+    def _reparse(self, code):
+        """Parse ``code`` from scratch.
+
+        If it doesn't parse, leave everything as it was, so the next update
+        is still compared against text we have an AST for.
+
+        """
+        ast = parse(code, self.shell)
+        self.code, self.ast = code, ast
+        self._astral = bool(ASTRAL and ASTRAL.search(code))
+        self._lines = _line_starts(code)
+        self._starts = [_offset(self._lines, node['loc']['start']) for node
+                        in self.ast['body']]
+        self._records = [None] * len(self._starts)
+        return self.ast
+
+    def update(self, code):
+        """Bring the AST up to date with the new text of the file, and return
+        it.
+
+        Raise :class:`~spiderflunky.parser.JsReflectException` if ``code``
+        doesn't parse, as :func:`~spiderflunky.parser.parse` would.
+
+        """
+        code = prepare_code(code)
+        old, body = self.code, self.ast['body']
+        if code == old:
+            return self.ast
+        num = len(body)
+        # Rather than count UTF-16 units, reparse everything when there are
+        # characters that would need it.
+        if not num or self._astral or ASTRAL and ASTRAL.search(code):
+            return self._reparse(code)
+        bounds = [0] + self._starts[1:] + [len(old)]
+        delta = len(code) - len(old)
+
+        # How many statements at the start and end are untouched by the edit?
+        # These are binary searches, so the comparing happens in C rather
+        # than in a loop over every statement. Each step compares only the
+        # text not already known to match, so all of them together copy about
+        # one file's worth of text.
+        lo, hi = 0, num
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if old[bounds[lo]:bounds[mid]] == code[bounds[lo]:bounds[mid]]:
+                lo = mid
+            else:
+                hi = mid - 1
+        # If text was added past the end, call the last statement changed.
+        before = min(lo, num - 1)
+        lo, hi = before + 1, num
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if (bounds[mid] + delta >= bounds[before] and
+                    old[bounds[mid]:bounds[hi]] ==
+                    code[bounds[mid] + delta:bounds[hi] + delta]):
+                hi = mid
+            else:
+                lo = mid + 1
+        after = num - lo
+
+        # Reparse the changed statements plus a neighbor on each side. The
+        # trailing neighbor must still span exactly what it used to;
+        # otherwise, the edit reached into it, and the statements after it
+        # may have changed meaning. In that case, take in more statements
+        # after it, twice as many each time, until one does or the file runs
+        # out.
+        first = max(before - 1, 0)
+        last, more = min(num - after + 1, num), 1  # exclusive
+        origin = body[first]['loc']['start'] if first else {'line': 1,
+                                                            'column': 0}
+        while True:
+            end = bounds[last] + delta
+            try:
+                region = parse(code[bounds[first]:end], self.shell)
+            except JsReflectException:
+                return self._reparse(code)
+            # Changing the directive prologue can change what's legal in
+            # every later statement, so in that case nothing can be reused.
+            if (before < _prologue_length(body) or
+                    not first and _prologue_length(region['body']) > before):
+                return self._reparse(code)
+            region = shifted(region, 1, 0, origin['line'], origin['column'])
+            # Only line starts within the reparsed region need finding.
+            lines = (self._lines[:bisect_right(self._lines, bounds[first])] +
+                     [m.end() for m in NEWLINES.finditer(code, bounds[first],
+                                                         end)] +
+                     [start + delta for start in
+                      self._lines[bisect_right(self._lines, bounds[last]):]])
+            new_starts = [_offset(lines, node['loc']['start']) for node in
+                          region['body']]
+            if last == num:
+                break
+            sentinel = body[last - 1]
+            new_sentinel = region['body'][-1] if region['body'] else None
+            if (new_sentinel is not None and
+                    new_sentinel['type'] == sentinel['type'] and
+                    new_starts[-1] == self._starts[last - 1] + delta and
+                    _offset(lines, new_sentinel['loc']['end']) ==
+                    _offset(self._lines, sentinel['loc']['end']) + delta):
+                break
+            last, more = min(last + more, num), more * 2
+
+        if last < num:
+            # Move the statements after the edit. Earlier ASTs share them, so
+            # the ones that move get copied. If no lines were added or
+            # removed, only those on the edit's last line move at all.
+            start = body[last]['loc']['start']
+            line, column = start['line'], start['column']
+            to_line, to_column = _position(lines,
+                                           self._starts[last] + delta)
+            moved = last
+            if (to_line, to_column) != (line, column):
+                while moved < num and (to_line != line or
+                                       body[moved]['loc']['start']['line'] ==
+                                           line):
+                    moved += 1
+            suffix = ([shifted(node, line, column, to_line, to_column) for
+                       node in body[last:moved]] + body[moved:])
+            suffix_records = ([None] * (moved - last) +
+                              self._records[moved:])
+            end = _moved(self.ast['loc']['end'], line, to_line - line,
+                         to_column - column)
+        else:
+            suffix, suffix_records = [], []
+            end = region['loc']['end']
+
+        self.ast = dict(self.ast,
+                        body=body[:first] + region['body'] + suffix,
+                        loc=dict(self.ast['loc'],
+                                 start=(self.ast if first else
+                                        region)['loc']['start'],
+                                 end=end))
+        self.code = code
+        self._lines = lines
+        self._starts = (self._starts[:first] + new_starts +
+                        [s + delta for s in self._starts[last:]])
+        self._records = (self._records[:first] +
+                         [None] * len(region['body']) +
+                         suffix_records)
+        return self.ast
+
+    def index(self):
+        """Return what :func:`~spiderflunky.indexer.transform` would for the
+        current AST, reindexing only the statements that changed.
+
+        """
+        # Records are kept only for statements update() reused as they were;
+        # the ones it moved are copies and get reindexed.
+        for i, node in enumerate(self.ast['body']):
+            if self._records[i] is None:
+                self._records[i] = transform(node)
+        _, program = process((NONE_GROUP, [self.ast]))
+        index = {NONE_GROUP: program}
+        for records in self._records:
+            for group, metadatas in records.iteritems():
+                index.setdefault(group, []).extend(metadatas)
+        return index
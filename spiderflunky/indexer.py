@@ -9,6 +9,9 @@ of metadata.
 """
 from funcy import group_by, walk, identity, merge
 
+from spiderflunky.js_ast import walk_down
+from spiderflunky.parser import symbol
+
 
 FUNC_GROUP = 'function'
 ARROW_GROUP = 'arrow'
@@ -18,17 +21,17 @@ SYM_GROUP = 'symbol'
 NONE_GROUP = 'None'
 
 
-# mapping type -> GROUP
+# mapping type -> GROUP, keyed by interned types to match parsed nodes
 GROUPS = {
-    'Function': FUNC_GROUP,
-    'FunctionExpression': FUNC_GROUP,
-    'FunctionDeclaration': FUNC_GROUP,
-    'ArrowExpression': ARROW_GROUP,
-    'VariableDeclaration': VAR_GROUP,
-    'LetStatement': VAR_GROUP,
-    'LetExpression': VAR_GROUP,
-    'CallExpression': CALL_GROUP,
-    'Identifier': SYM_GROUP
+    symbol(u'Function'): FUNC_GROUP,
+    symbol(u'FunctionExpression'): FUNC_GROUP,
+    symbol(u'FunctionDeclaration'): FUNC_GROUP,
+    symbol(u'ArrowExpression'): ARROW_GROUP,
+    symbol(u'VariableDeclaration'): VAR_GROUP,
+    symbol(u'LetStatement'): VAR_GROUP,
+    symbol(u'LetExpression'): VAR_GROUP,
+    symbol(u'CallExpression'): CALL_GROUP,
+    symbol(u'Identifier'): SYM_GROUP
 }
 
 
@@ -39,7 +42,7 @@ def _categorize(node):
 
 def categorize(ast):
     """Group ast nodes based on their type."""
-    return group_by(_categorize, ast.walk_down())
+    return group_by(_categorize, walk_down(ast))
 
 
 def add_span(node):
@@ -49,10 +52,15 @@ def add_span(node):
     return {'span': node['loc']}
 
 
+def _declarations(node):
+    """Return the declarators of a var or let node."""
+    return node['declarations'] if 'declarations' in node else node['head']
+
+
 # mapping GROUP -> (node -> metadata)
 PROCESS = {
-    FUNC_GROUP: lambda node: {'name': node['id']['name']},
-    VAR_GROUP: lambda node: {'name': node.children()[0]['id']['name']},
+    FUNC_GROUP: lambda node: {'name': node['id'] and node['id']['name']},
+    VAR_GROUP: lambda node: {'name': _declarations(node)[0]['id']['name']},
     ARROW_GROUP: lambda _: {},
     CALL_GROUP: lambda _: {},
     SYM_GROUP: lambda node: {'name': node['name']},
@@ -11,14 +11,20 @@ from parsimonious.nodes import NodeVisitor
 from funcy import constantly, is_mapping, ifilter, flatten, iflatten
 from toposort import toposort_flatten
 
-
-CALL_EXPR = "CallExpression"
-FUNC_EXPR = "FunctionExpression"
-IDENT = "Identifier"
-PROGRAM = "Program"
-ASSIGN_EXPR = "AssignmentExpression"
-VAR_DECLARATOR = "VariableDeclarator"
-FUNC_DECL = "FunctionDeclaration"
+from spiderflunky.parser import symbol
+
+
+# Interned, so comparing against the types of parsed nodes hits the identity
+# fast path
+CALL_EXPR = symbol(u"CallExpression")
+FUNC_EXPR = symbol(u"FunctionExpression")
+IDENT = symbol(u"Identifier")
+PROGRAM = symbol(u"Program")
+ASSIGN_EXPR = symbol(u"AssignmentExpression")
+VAR_DECLARATOR = symbol(u"VariableDeclarator")
+FUNC_DECL = symbol(u"FunctionDeclaration")
+EXPR_STMT = symbol(u"ExpressionStatement")
+LITERAL = symbol(u"Literal")
 
 
 def is_node(item):
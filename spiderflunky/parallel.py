@@ -0,0 +1,130 @@
+"""Analyze a single huge AST on several cores at once.
+
+A big concatenated bundle parses to one ``Program`` whose top-level
+statements can be analyzed independently of each other. We cut its body into
+contiguous chunks, analyze them in a process pool, and concatenate what comes
+back. Each chunk's results are sorted by span, and the chunks themselves don't
+overlap, so the merge is exactly what :func:`analyze` gives for the whole
+``Program``.
+
+The workers get the AST through the pool's initializer, which, where
+processes fork, costs no serialization at all. Only chunk bounds go out, and
+only flat tuples come back.
+
+Parallelism comes only from having many top-level statements. A bundle
+wrapped in a single top-level function expression, as many are, is one chunk
+and runs on one core.
+
+"""
+from multiprocessing import Pool, cpu_count
+
+from spiderflunky.calls import call_edges, callee_name
+from spiderflunky.dataflow import assignments
+from spiderflunky.indexer import NONE_GROUP, transform
+from spiderflunky.js_ast import PROGRAM
+
+
+# How many chunks to give each process, to even out differently sized ones
+CHUNKS_PER_PROCESS = 8
+
+NO_SPAN = (None, None, None, None)
+
+
+def _span(loc):
+    """Flatten a ``loc`` into (line, column, end line, end column)."""
+    start, end = loc['start'], loc['end']
+    return start['line'], start['column'], end['line'], end['column']
+
+
+def _function_name(node):
+    """Return the name of a function node, or None if it's anonymous or
+    not there at all."""
+    return node['id']['name'] if node and node.get('id') else None
+
+
+def analyze(ast):
+    """Return the index records, call edges, and assignments of ``ast``.
+
+    The return value is a dict of flat tuples, each list sorted, and so in
+    source order:
+
+    ``index``
+        ``{group: [(line, column, end line, end column, name)]}`` from
+        :func:`~spiderflunky.indexer.transform`, leaving out its ungrouped
+        nodes, which are just the AST over again. The name is None for
+        groups without one.
+    ``calls``
+        ``(line, column, end line, end column, callee, caller, caller line,
+        caller column, caller end line, caller end column)`` for each call
+        site. The caller is the nearest enclosing function; its fields are
+        None at the top level.
+    ``assignments``
+        ``(line, column, end line, end column)`` of each assignment from
+        :func:`~spiderflunky.dataflow.assignments`
+
+    """
+    index = dict((group, sorted(_span(record['span']) +
+                                (record.get('name'),)
+                                for record in records))
+                 for group, records in transform(ast).iteritems() if
+                 group != NONE_GROUP)
+    calls = sorted(_span(call_site['loc']) +
+                   (callee_name(call_site), _function_name(caller)) +
+                   (_span(caller['loc']) if caller else NO_SPAN)
+                   for caller, call_site in call_edges(ast))
+    return {'index': index,
+            'calls': calls,
+            'assignments': sorted(_span(node['loc']) for node in
+                                  assignments(ast))}
+
+
+# The body of the Program being analyzed, in each worker
+_body = None
+
+
+def _init_worker(body):
+    """Keep the statements to analyze where :func:`_analyze_chunk` can get
+    at them. This runs once in each worker, as the pool starts it."""
+    global _body
+    _body = body
+
+
+def _analyze_chunk((start, stop)):
+    """Analyze a slice of the top-level statements in ``_body``."""
+    return analyze({'type': PROGRAM, 'body': _body[start:stop], 'loc': None})
+
+
+def chunks(length, num):
+    """Split ``range(length)`` into at most ``num`` contiguous, nearly equal
+    (start, stop) slices."""
+    num = min(num, length)
+    return [(length * i // num, length * (i + 1) // num) for i in xrange(num)]
+
+
+def analyze_parallel(ast, processes=None):
+    """Return what :func:`analyze` would for a ``Program`` node, farming its
+    top-level statements out to ``processes`` worker processes.
+
+    :arg processes: How many workers to use. Defaults to the number of CPUs.
+
+    """
+    processes = processes or cpu_count()
+    body = ast['body']
+    pool = Pool(processes, initializer=_init_worker, initargs=(body,))
+    try:
+        results = pool.map(_analyze_chunk,
+                           chunks(len(body), processes * CHUNKS_PER_PROCESS),
+                           chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    index = {}
+    for result in results:
+        for group, records in result['index'].iteritems():
+            index.setdefault(group, []).extend(records)
+    return {'index': index,
+            'calls': [call for result in results for call in
+                      result['calls']],
+            'assignments': [assignment for result in results for assignment
+                            in result['assignments']]}
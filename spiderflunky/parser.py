@@ -24,16 +24,68 @@ class JsReflectException(Exception):
 
 ERROR_CODE = 100
 
+# The strings the code itself compares parsed nodes against, like node
+# types. Only constants go in here, never anything from a parse; tables for
+# parsing are copied from it by symbol_table().
+SYMBOLS = {}
 
-def parse(code, shell='js'):
-    return raw_parse(code, shell)
+# Keys whose string values get interned
+INTERNED_VALUES = frozenset(['type', 'name'])
 
 
-def raw_parse(code, shell):
+def symbol(string, symbols=SYMBOLS):
+    """Return the interned copy of ``string`` from ``symbols``, adding it if
+    it isn't there yet."""
+    return symbols.setdefault(string, string)
+
+
+def symbol_table():
+    """Return a new symbol table for interning parses through.
+
+    It starts out holding the module-level constants, so parsed node types
+    are the very objects those are. Keep it as long as the ASTs decoded
+    through it should share strings, and then drop it; it holds every
+    identifier name it has seen.
+
+    """
+    return dict(SYMBOLS)
+
+
+def interned_object(obj, symbols):
+    """Intern the values of any ``INTERNED_VALUES`` keys of a decoded JSON
+    object through ``symbols``, and return the object.
+
+    Meant as a ``json.loads`` ``object_hook``, so every AST decoded with the
+    same table shares one copy of each node type and identifier name. Keys
+    are left alone: the decoder already shares repeated keys within one
+    document.
+
+    This trades time for memory. Decoding a 62 MB AST took about 30% longer
+    with it (5.4s to 7.0s) and peaked about 11% lower (499 MB to 443 MB).
+
+    """
+    for key in INTERNED_VALUES:
+        # Most objects are positions with neither key, so look before
+        # getting.
+        if key in obj:
+            value = obj[key]
+            if isinstance(value, basestring):
+                obj[key] = symbols.setdefault(value, value)
+    return obj
+
+
+def parse(code, shell='js', symbols=None):
+    return raw_parse(code, shell, symbols=symbols)
+
+
+def raw_parse(code, shell, symbols=None):
     """Return an AST of the JS passed in ``code`` in native Reflect.parse
     format
 
     :arg shell: Path to the ``js`` interpreter
+    :arg symbols: A symbol table from :func:`symbol_table` through which to
+        intern node types and identifier names. By default, nothing is
+        interned. See :func:`interned_object` for what that costs.
 
     """
     code = prepare_code(code)
@@ -74,7 +126,9 @@ def raw_parse(code, shell):
 
         data = decode(data)
 
-        parsed = json.loads(data, strict=False)
+        parsed = json.loads(data, strict=False,
+                            object_hook=None if symbols is None else
+                                partial(interned_object, symbols=symbols))
 
         if error_code == ERROR_CODE:
             if parsed.get("error"):
@@ -105,7 +159,9 @@ def prepare_code(code):
     code = decode(code)
     # Acceptable unicode characters still need to be stripped. Just remove the
     # slash: a character is necessary to prevent bad identifier errors.
-    return JS_ESCAPE.sub("u", code)
+    # Looking for a backslash first is much faster than running the regex
+    # over code that has none.
+    return JS_ESCAPE.sub("u", code) if '\\' in code else code
 
 
 # From https://github.com/mattbasta/app-validator/blob/ac8e0163f00ad1f989f4d08d59a6e8d51d5c6d2b/appvalidator/unicodehelper.py:
@@ -0,0 +1,159 @@
+"""Index whole trees of JS in bounded memory.
+
+Each file is parsed, indexed, and boiled down to a sorted segment of JSON
+lines on disk before the next file is read, so no AST outlives its own file.
+The segments are then merged, external-sort style, into a single index
+sorted by (group, path, line, column). Peak memory is bounded by the largest
+single file plus one buffered line per segment being merged.
+
+"""
+import heapq
+import os
+import shutil
+import tempfile
+
+import simplejson as json
+
+from spiderflunky.calls import call_sites, callee_name
+from spiderflunky.indexer import NONE_GROUP, transform
+from spiderflunky.parser import JsReflectException, parse, symbol_table
+
+
+CALLSITE_GROUP = 'callsite'
+
+# The most segments we keep open at once while merging
+MERGE_FANIN = 64
+
+
+def _record(group, path, metadata):
+    """Return a flat, sortable index record."""
+    start = metadata['span']['start']
+    return [group, path, start['line'], start['column'], metadata]
+
+
+def records(path, ast):
+    """Return a sorted list of index records for one file's AST.
+
+    Each record is ``[group, path, line, column, metadata]``. Besides the
+    groups from :func:`~spiderflunky.indexer.transform`, each call site gets
+    a ``callsite`` record noting the name of its callee. Ungrouped nodes are
+    left out: their metadata is a copy of their whole subtree, which would
+    write the AST out again at every level of nesting.
+
+    """
+    ret = [_record(group, path, metadata) for group, metadatas in
+           transform(ast).iteritems() if group != NONE_GROUP
+           for metadata in metadatas]
+    ret.extend(_record(CALLSITE_GROUP, path,
+                       {'span': call_site['loc'],
+                        'callee': callee_name(call_site)})
+               for call_site in call_sites(ast))
+    ret.sort(key=lambda record: record[:4])
+    return ret
+
+
+def write_segment(records, directory):
+    """Write already-sorted records to a new segment file in ``directory``,
+    and return its path."""
+    fd, path = tempfile.mkstemp(suffix='.seg', dir=directory)
+    with os.fdopen(fd, 'wb') as segment:
+        for record in records:
+            segment.write(json.dumps(record, sort_keys=True) + '\n')
+    return path
+
+
+def spill(path, directory, shell='js', symbols=None):
+    """Parse and index the JS file at ``path``, write its records to a
+    segment in ``directory``, and return the segment's path.
+
+    :arg symbols: A symbol table to intern the AST through, as for
+        :func:`~spiderflunky.parser.parse`
+
+    """
+    with open(path, 'rb') as source:
+        code = source.read()
+    return write_segment(records(path, parse(code, shell, symbols=symbols)),
+                         directory)
+
+
+def _keyed_lines(segment):
+    """Yield (sort key, raw line) for each record in an open segment."""
+    for line in segment:
+        yield tuple(json.loads(line)[:4]), line
+
+
+def _merge_into(segments, out):
+    """Merge the sorted segment files at the paths ``segments`` into the
+    open file ``out``."""
+    files = [open(path, 'rb') for path in segments]
+    try:
+        for _, line in heapq.merge(*[_keyed_lines(f) for f in files]):
+            out.write(line)
+    finally:
+        for f in files:
+            f.close()
+
+
+def merge_segments(segments, out, directory, fanin=MERGE_FANIN):
+    """Merge sorted segments into the single sorted index file ``out``.
+
+    When there are more than ``fanin`` segments, merge them in passes,
+    writing intermediate segments to ``directory``, so we never hold more
+    than ``fanin`` files open. Consumed segments are deleted.
+
+    """
+    segments = list(segments)
+    while len(segments) > fanin:
+        merged = []
+        for i in xrange(0, len(segments), fanin):
+            batch = segments[i:i + fanin]
+            fd, path = tempfile.mkstemp(suffix='.seg', dir=directory)
+            with os.fdopen(fd, 'wb') as intermediate:
+                _merge_into(batch, intermediate)
+            for segment in batch:
+                os.unlink(segment)
+            merged.append(path)
+        segments = merged
+    with open(out, 'wb') as index:
+        _merge_into(segments, index)
+    for segment in segments:
+        os.unlink(segment)
+
+
+def index_tree(paths, out, shell='js', fanin=MERGE_FANIN, intern=False):
+    """Index the JS files at ``paths`` one at a time, writing the merged
+    records to the file ``out`` as JSON lines.
+
+    Files that don't parse are skipped. Return a list of (path,
+    :class:`~spiderflunky.parser.JsReflectException`) for each of them.
+
+    Read the index back with :func:`iter_index`.
+
+    :arg intern: Whether to intern each file's node types and identifier
+        names while decoding its AST. This lowers the peak memory of big
+        files a little and makes decoding them slower; see
+        :func:`~spiderflunky.parser.interned_object`. Each file gets its own
+        table, since its AST is gone before the next file is read.
+
+    """
+    directory = tempfile.mkdtemp(prefix='spiderflunky-')
+    try:
+        segments, failures = [], []
+        for path in paths:
+            symbols = symbol_table() if intern else None
+            try:
+                segments.append(spill(path, directory, shell, symbols))
+            except JsReflectException as exc:
+                failures.append((path, exc))
+        merge_segments(segments, out, directory, fanin=fanin)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return failures
+
+
+def iter_index(path):
+    """Yield the records of an index written by :func:`index_tree`, in
+    order."""
+    with open(path, 'rb') as index:
+        for line in index:
+            yield json.loads(line)
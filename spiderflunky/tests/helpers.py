@@ -0,0 +1,53 @@
+"""Hand-built ASTs for tests that shouldn't need a ``js`` shell"""
+
+
+def loc(line, column, length=1):
+    return {'start': {'line': line, 'column': column},
+            'end': {'line': line, 'column': column + length},
+            'source': None}
+
+
+def ident(name, line, column):
+    return {'type': 'Identifier', 'name': name,
+            'loc': loc(line, column, len(name))}
+
+
+def call(name, line, column):
+    return {'type': 'CallExpression',
+            'callee': ident(name, line, column),
+            'arguments': [],
+            'loc': loc(line, column, len(name) + 2)}
+
+
+def statements(line):
+    """Return the top-level statements of ``function f() { g(); }
+    x = f; f();``, starting on ``line``."""
+    return [
+        {'type': 'FunctionDeclaration',
+         'id': ident('f', line, 9),
+         'params': [],
+         'body': {'type': 'BlockStatement',
+                  'body': [{'type': 'ExpressionStatement',
+                            'expression': call('g', line + 1, 4),
+                            'loc': loc(line + 1, 4, 4)}],
+                  'loc': loc(line, 13, 20)},
+         'loc': loc(line, 0, 30)},
+        {'type': 'ExpressionStatement',
+         'expression': {'type': 'AssignmentExpression',
+                        'operator': '=',
+                        'left': ident('x', line + 3, 0),
+                        'right': ident('f', line + 3, 4),
+                        'loc': loc(line + 3, 0, 5)},
+         'loc': loc(line + 3, 0, 6)},
+        {'type': 'ExpressionStatement',
+         'expression': call('f', line + 4, 0),
+         'loc': loc(line + 4, 0, 4)}]
+
+
+def program(copies=1, line=1):
+    """Return a Program of ``copies`` runs of :func:`statements`, one after
+    another, starting on ``line``."""
+    body = []
+    for i in xrange(copies):
+        body.extend(statements(line + i * 5))
+    return {'type': 'Program', 'body': body, 'loc': loc(line, 0, 10)}
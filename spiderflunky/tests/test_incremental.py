@@ -0,0 +1,95 @@
+from nose.tools import assert_raises, eq_
+
+from spiderflunky.incremental import IncrementalParser, shifted
+from spiderflunky.indexer import transform
+from spiderflunky.parser import JsReflectException, parse
+
+
+def test_shifted():
+    """Only positions on the starting line should change columns, and only in
+    the copy."""
+    node = {'type': 'Identifier',
+            'name': 'a',
+            'loc': {'start': {'line': 3, 'column': 4},
+                    'end': {'line': 4, 'column': 1}}}
+    eq_(shifted(node, 3, 4, 5, 0)['loc'],
+        {'start': {'line': 5, 'column': 0},
+         'end': {'line': 6, 'column': 1}})
+    eq_(node['loc'], {'start': {'line': 3, 'column': 4},
+                      'end': {'line': 4, 'column': 1}})
+
+
+def assert_update(before, after):
+    """Make sure updating from ``before`` to ``after`` gives the same AST and
+    index as parsing ``after`` from scratch."""
+    parser = IncrementalParser(before)
+    parser.index()
+    eq_(parser.update(after), parse(after))
+    eq_(parser.index(), transform(parse(after)))
+
+
+def test_edit_middle():
+    """Edits that add lines should shift the statements after them."""
+    assert_update("""function a() {}
+                     function b() {}
+                     a();""",
+                  """function a() {}
+                     function b() {
+                         a();
+                     }
+                     a();""")
+
+
+def test_edit_same_line():
+    """Edits should shift columns of statements later on the same line."""
+    assert_update('a(); b(); c();', 'a(); bbb(1); c();')
+
+
+def test_asi():
+    """Removing a semicolon can merge statements outside the edited one."""
+    assert_update('var a = b;\n(c);\nd();', 'var a = b\n(c);\nd();')
+
+
+def test_earlier_results_unchanged():
+    """Moving statements shouldn't rewrite ASTs or indices already handed
+    out."""
+    parser = IncrementalParser('a();\nb();\nc();')
+    old_ast = parser.ast
+    old_index = parser.index()
+    parser.update('x();\na();\nb();\nc();')
+    eq_(old_ast, parse('a();\nb();\nc();'))
+    eq_(old_index, transform(parse('a();\nb();\nc();')))
+    eq_([r['span']['start'] for r in parser.index()['symbol'] if
+         r['name'] == 'c'],
+        [{'line': 4, 'column': 0}])
+
+
+def test_failed_update():
+    """Text that doesn't parse, as between keystrokes, shouldn't throw off
+    the next update."""
+    parser = IncrementalParser('a();\ng(1);\nb();\nc();\nd();\ne();')
+    assert_raises(JsReflectException, parser.update,
+                  'a();\ng(2);\nb();\nc();\nd(;;\ne();')
+    fixed = 'a();\ng(2);\nb();\nc();\nd();\ne();'
+    eq_(parser.update(fixed), parse(fixed))
+
+
+def test_use_strict():
+    """Turning on strict mode should recheck every later statement."""
+    parser = IncrementalParser('"use stric";\nf();\nwith (a) {}')
+    assert_raises(JsReflectException, parser.update,
+                  '"use strict";\nf();\nwith (a) {}')
+
+
+def test_edit_into_neighbor():
+    """An edit that joins a changed statement to the one after it should
+    still come out right."""
+    assert_update('a;\nfox;\no;\nb;\nc;', 'a;\nfoo;\nb;\nc;')
+
+
+def test_astral_characters():
+    """Reflect.parse counts characters outside the BMP as two columns, so
+    statements after them should still come out where it says."""
+    assert_update(u'a("\U0001f600"); b();\nc();',
+                  u'a("\U0001f600"); bb();\nc();')
+    assert_update(u'a(); b();\nc();', u'a("\U0001f600"); b();\nc();')
@@ -0,0 +1,25 @@
+from nose.tools import eq_
+
+from spiderflunky.parallel import analyze, analyze_parallel, chunks
+from spiderflunky.tests.helpers import program
+
+
+def test_chunks():
+    """Chunks should cover every statement, in order."""
+    eq_(chunks(10, 4), [(0, 2), (2, 5), (5, 7), (7, 10)])
+    eq_(chunks(2, 4), [(0, 1), (1, 2)])
+
+
+def test_analyze():
+    results = analyze(program(1))
+    eq_([(c[5], c[4]) for c in results['calls']],
+        [('f', 'g'), (None, 'f')])
+    eq_(results['assignments'], [(4, 0, 4, 5)])
+    eq_([r[4] for r in results['index']['function']], ['f'])
+
+
+def test_parallel_matches_sequential():
+    """The merged results of a parallel run should be the same as a
+    sequential one."""
+    ast = program(50)
+    eq_(analyze_parallel(ast, processes=3), analyze(ast))
@@ -0,0 +1,21 @@
+import simplejson as json
+from nose.tools import eq_, ok_
+
+from spiderflunky.js_ast import IDENT
+from spiderflunky.parser import SYMBOLS, interned_object, symbol_table
+
+
+def test_interned_object():
+    """Types and names should come out as the same objects across separate
+    decodings, but other strings shouldn't be interned."""
+    symbols = symbol_table()
+    hook = lambda obj: interned_object(obj, symbols)
+    js = '{"type": "Identifier", "name": "%s", "value": "%s"}'
+    a = json.loads(js % ('foo', 'bar'), object_hook=hook)
+    b = json.loads(js % ('foo', 'bar'), object_hook=hook)
+    eq_(a, b)
+    ok_(a['type'] is b['type'])
+    ok_(a['name'] is b['name'])
+    ok_('bar' not in symbols)
+    ok_(a['type'] is IDENT)
+    ok_('foo' not in SYMBOLS)
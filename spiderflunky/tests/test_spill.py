@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+
+from nose.tools import eq_
+
+from spiderflunky.spill import (index_tree, iter_index, merge_segments,
+                                records, write_segment)
+from spiderflunky.tests.helpers import program
+
+
+def test_records():
+    """Make sure a file's records are sorted and include call-site facts."""
+    recs = records('a.js', program())
+    eq_(recs, sorted(recs, key=lambda r: r[:4]))
+    eq_([(r[4]['callee'], r[2], r[3]) for r in recs if r[0] == 'callsite'],
+        [('g', 2, 4), ('f', 5, 0)])
+    eq_([r[4]['name'] for r in recs if r[0] == 'function'], ['f'])
+
+
+def test_records_skip_ungrouped():
+    """Ungrouped nodes would drag their whole subtrees into the segment."""
+    eq_([r for r in records('a.js', program()) if r[0] == 'None'], [])
+
+
+def test_merge_segments():
+    """Merging in several passes should give the same order as sorting
+    everything in memory."""
+    directory = tempfile.mkdtemp()
+    try:
+        inputs = [('%s.js' % name, program(line=line)) for name, line in
+                  [('c', 3), ('a', 1), ('b', 7), ('a2', 2), ('d', 5)]]
+        expected = sorted((r for path, ast in inputs for r in
+                           records(path, ast)),
+                          key=lambda r: r[:4])
+        segments = [write_segment(records(path, ast), directory) for
+                    path, ast in inputs]
+        out = os.path.join(directory, 'index')
+        merge_segments(segments, out, directory, fanin=2)
+
+        eq_([r[:4] for r in iter_index(out)], [r[:4] for r in expected])
+        eq_(os.listdir(directory), ['index'])
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_index_tree_skips_unparseable():
+    """A file that doesn't parse should be reported, not sink the whole
+    tree."""
+    directory = tempfile.mkdtemp()
+    try:
+        good, bad = [os.path.join(directory, name) for name in
+                     ['good.js', 'bad.js']]
+        with open(good, 'w') as f:
+            f.write('function f() {}\nf();\n')
+        with open(bad, 'w') as f:
+            f.write('function {\n')
+        out = os.path.join(directory, 'index')
+
+        failures = index_tree([bad, good], out)
+        eq_([path for path, _ in failures], [bad])
+        eq_(set(r[1] for r in iter_index(out)), set([good]))
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_index_tree_intern():
+    """Interning should change nothing about what gets indexed."""
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'a.js')
+        with open(path, 'w') as f:
+            f.write('function f(a) { return a; }\nf(f);\n')
+        plain, interned = [os.path.join(directory, name) for name in
+                           ['plain', 'interned']]
+        index_tree([path], plain)
+        index_tree([path], interned, intern=True)
+        eq_(list(iter_index(interned)), list(iter_index(plain)))
+    finally:
+        shutil.rmtree(directory)